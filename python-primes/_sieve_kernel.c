@@ -0,0 +1,73 @@
+/*
+ * Native composite-marking and prime-collection kernels for prime_generator.py
+ *
+ * Build with `make kernel`; prime_generator loads the resulting
+ * _sieve_kernel.so through ctypes and falls back to numba / NumPy when
+ * the library is missing.
+ *
+ * Layout matches _mark_composites_py: sieve[i] represents odd_low + 2*i,
+ * 1 = candidate prime, cleared to 0 when marked composite. next_multiple
+ * holds each prime's next odd multiple to mark on entry and is advanced
+ * past the segment on return.
+ */
+
+#include <stdint.h>
+
+void mark_composites(
+    uint8_t *sieve,
+    const int64_t *base_primes,
+    int64_t *next_multiple,
+    int64_t num_primes,
+    int64_t odd_low,
+    int64_t seg_len,
+    int64_t block_size)
+{
+    if (num_primes <= 0 || seg_len <= 0) {
+        return;
+    }
+
+    /* next_multiple holds odd-only indices while the blocks are swept */
+    for (int64_t i = 0; i < num_primes; i++) {
+        next_multiple[i] = (next_multiple[i] - odd_low) >> 1;
+    }
+
+    /* Sweep cache-sized blocks, carrying each prime's next index forward */
+    for (int64_t block_start = 0; block_start < seg_len; block_start += block_size) {
+        int64_t block_end = block_start + block_size;
+        if (block_end > seg_len) {
+            block_end = seg_len;
+        }
+        for (int64_t i = 0; i < num_primes; i++) {
+            int64_t p = base_primes[i];
+            int64_t j = next_multiple[i];
+            for (; j < block_end; j += p) {
+                sieve[j] = 0;
+            }
+            next_multiple[i] = j;
+        }
+    }
+
+    for (int64_t i = 0; i < num_primes; i++) {
+        next_multiple[i] = odd_low + 2 * next_multiple[i];
+    }
+}
+
+/*
+ * Write odd_low + 2*i for every candidate entry of the segment to out and
+ * return how many were written. out must have room for seg_len entries:
+ * each slot is written unconditionally and only kept when sieve[i] is 1,
+ * so the loop has no data-dependent branch to mispredict.
+ */
+int64_t collect_primes(
+    const uint8_t *sieve,
+    int64_t seg_len,
+    int64_t odd_low,
+    int64_t *out)
+{
+    int64_t count = 0;
+    for (int64_t i = 0; i < seg_len; i++) {
+        out[count] = odd_low + 2 * i;
+        count += sieve[i];
+    }
+    return count;
+}
@@ -6,158 +6,667 @@ Optimized with Sieve of Eratosthenes algorithm
 
 Optimizations:
 - Odd-only sieve: skips even numbers (2x memory + work reduction)
-- bytearray sieve with slice assignment for fast composite marking
-- memoryview for zero-copy segment operations
-- heapq.merge for O(n) parallel result merging
-- Shared multiprocessing.Value instead of Manager for progress counter
+- NumPy uint8 sieve with strided slice assignment for fast composite marking
+- Bit-packed classic sieve (1 bit per odd number)
+- Optional mod-30 wheel layout (8 bits per 30 numbers)
+- Small primes cleared from the packed sieves with repeating uint64 word masks
+- Presieve pattern for 3, 5, 7, 11, 13 copied into each segment
+- np.flatnonzero for vectorized prime extraction
+- Native C composite-marking kernel (ctypes) when built, else numba, else NumPy
+- Branchless native/numba prime collection (np.flatnonzero as fallback)
+- Next multiple per base prime carried across sequential segments (no division)
+- Round-robin segment assignment to balance parallel workers
+- Parallel workers return int64 arrays, reassembled in segment order
+- Primes returned as packed array('q') (8 bytes each, not a list of ints)
+- Base primes shared with workers via multiprocessing.shared_memory
+- imap_unordered tasks with parent-side progress (no shared counter)
+- Optional CUDA offload via CuPy (force_algorithm="gpu", very large n)
+- Prime list streamed to stdout in bounded chunks (no giant joined string)
 """
 
-import heapq
+import ctypes
+import functools
 import multiprocessing
 import math
+import os
 import sys
-import threading
 import time as time_module
-from typing import List, Optional, Callable, Any
+from array import array
+from multiprocessing import shared_memory
+from types import ModuleType
+from typing import BinaryIO, List, Optional, Callable, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+
+def _cache_size(level: int, default: int) -> int:
+    """Return the size in bytes of the CPU's level-`level` data cache.
+
+    Tries os.sysconf first, then Linux sysfs, and falls back to default
+    when neither reports a size.
+
+    Args:
+        level: Cache level (1 for L1 data, 2 for L2, ...)
+        default: Size to use when detection fails
+    """
+    name = 'SC_LEVEL1_DCACHE_SIZE' if level == 1 else f'SC_LEVEL{level}_CACHE_SIZE'
+    try:
+        size = os.sysconf(name)
+        if size > 0:
+            return size
+    except (ValueError, OSError, AttributeError):
+        pass
+
+    cache_dir = '/sys/devices/system/cpu/cpu0/cache'
+    try:
+        for entry in sorted(os.listdir(cache_dir)):
+            path = os.path.join(cache_dir, entry)
+            with open(os.path.join(path, 'level')) as f:
+                if int(f.read()) != level:
+                    continue
+            with open(os.path.join(path, 'type')) as f:
+                if f.read().strip() == 'Instruction':
+                    continue
+            with open(os.path.join(path, 'size')) as f:
+                text = f.read().strip()
+            units = {'K': 1024, 'M': 1024 * 1024}
+            if text and text[-1] in units:
+                return int(text[:-1]) * units[text[-1]]
+            return int(text)
+    except (OSError, ValueError):
+        pass
+
+    return default
 
-# Type alias for multiprocessing shared counter
-SharedCounter = Any
 
 SEGMENTED_SIEVE_THRESHOLD = 10_000_000
 PARALLEL_SIEVE_THRESHOLD = 500_000_000
-DEFAULT_SEGMENT_SIZE = 1_000_000
+# force_algorithm="gpu" only offloads from here up; below it transfers and
+# kernel launches outweigh the device's bandwidth advantage
+GPU_SIEVE_THRESHOLD = 1_000_000_000
+# Numbers per GPU segment (128 MiB odd-only device buffer)
+GPU_SEGMENT_SIZE = 1 << 28
+# Threads per block in the GPU marking kernel (one block per base prime)
+GPU_THREADS_PER_BLOCK = 256
+L1_DCACHE_SIZE = _cache_size(1, 32 * 1024)
+# Numbers per segment: the odd-only buffer (1 byte per 2 numbers) fills L1d,
+# so each segment is marked without leaving the fastest cache
+DEFAULT_SEGMENT_SIZE = 2 * L1_DCACHE_SIZE
+# Parallel tasks queued per worker process (finer tasks overlap the tail)
+TASKS_PER_WORKER = 4
+# Odd-only entries marked per cache block (256 KB, sized for L2)
+SIEVE_BLOCK_SIZE = 256 * 1024
+# Small primes whose odd multiples are stamped from a repeating pattern
+PRESIEVE_PRIMES = (3, 5, 7, 11, 13)
+PRESIEVE_PERIOD = 3 * 5 * 7 * 11 * 13  # odd-only entries before the pattern repeats
+# Primes below this are cleared from the packed classic and wheel sieves
+# with a repeating 64-bit word mask (one pass) instead of 8 strided passes;
+# above it the p-word mask costs more to build than it saves
+WORD_MASK_PRIME_LIMIT = 256
+# Packed sieve bytes unpacked per prime-extraction chunk
+EXTRACT_CHUNK_BYTES = 1 << 16
+# Primes formatted per stdout write in main() (roughly 64 KB of text)
+OUTPUT_CHUNK_PRIMES = 8192
+# Mod-30 wheel: residues coprime to 2, 3 and 5, one bit each per byte
+WHEEL_RESIDUES = (1, 7, 11, 13, 17, 19, 23, 29)
+_WHEEL_RESIDUES_ARR = np.array(WHEEL_RESIDUES, dtype=np.int64)
+_WHEEL_BIT = {r: bit for bit, r in enumerate(WHEEL_RESIDUES)}
+
+
+def _build_presieve_pattern() -> np.ndarray:
+    """Build the odd-only composite pattern for PRESIEVE_PRIMES.
+
+    Entry i represents 3 + 2*i (0 = divisible by a presieve prime). The
+    pattern is stored twice over so any PRESIEVE_PERIOD-long window can be
+    sliced without wrapping.
+    """
+    odds = 3 + 2 * np.arange(2 * PRESIEVE_PERIOD, dtype=np.int64)
+    pattern = np.ones(2 * PRESIEVE_PERIOD, dtype=np.uint8)
+    for p in PRESIEVE_PRIMES:
+        pattern[odds % p == 0] = 0
+    return pattern
+
+
+_PRESIEVE_PATTERN = _build_presieve_pattern()
+
+
+def _first_multiples(base_primes: np.ndarray, odd_low: int) -> np.ndarray:
+    """Return each base prime's first odd multiple worth marking from odd_low.
+
+    That is max(p*p, smallest odd multiple of p >= odd_low). p is odd, so a
+    multiple is odd exactly when its quotient is: round the quotient up,
+    then up to odd. Vectorized, so starting a segment costs one NumPy
+    division pass rather than a division per prime inside the kernel.
+
+    Args:
+        base_primes: Odd base primes as an int64 array
+        odd_low: First odd number represented by the segment
+
+    Returns:
+        int64 array, one entry per base prime, for the next_multiple
+        argument of _mark_composites
+    """
+    q = (odd_low + base_primes - 1) // base_primes
+    q |= 1
+    q *= base_primes
+    return np.maximum(q, base_primes * base_primes)
+
+
+def _mark_composites_py(
+    sieve: np.ndarray,
+    base_primes: np.ndarray,
+    next_multiple: np.ndarray,
+    odd_low: int,
+    seg_len: int,
+) -> None:
+    """Mark odd multiples of base primes as composite in an odd-only segment.
+
+    Pure-Python fallback for _mark_composites when numba is unavailable.
+    The segment is swept in SIEVE_BLOCK_SIZE blocks so each pass over the
+    base primes stays L2-resident; every prime's next index is carried
+    from one block to the next.
+
+    Args:
+        sieve: uint8 buffer where index i represents odd_low + 2*i
+            (1 = candidate prime, cleared to 0 when marked composite)
+        base_primes: Odd base primes as an int64 array (excludes 2)
+        next_multiple: int64 array holding, per prime, the next odd multiple
+            to mark (>= odd_low, see _first_multiples). Advanced past the
+            segment on return, so the following segment can reuse it
+            without any division.
+        odd_low: First odd number represented by the segment
+        seg_len: Number of odd numbers in the segment
+    """
+    primes = base_primes.tolist()
+    # Map to index in odd-only array; step in index space = p
+    next_idx = ((next_multiple - odd_low) >> 1).tolist()
+
+    for block_start in range(0, seg_len, SIEVE_BLOCK_SIZE):
+        block_end = min(block_start + SIEVE_BLOCK_SIZE, seg_len)
+        for i, p in enumerate(primes):
+            j = next_idx[i]
+            if j >= block_end:
+                continue
+            sieve[j:block_end:p] = 0
+            next_idx[i] = j + ((block_end - j + p - 1) // p) * p
+
+    next_multiple[:] = np.asarray(next_idx, dtype=np.int64) * 2 + odd_low
+
+
+if _HAS_NUMBA:
+    @njit(cache=True, boundscheck=False, fastmath=True)
+    def _mark_composites_numba(
+        sieve: np.ndarray,
+        base_primes: np.ndarray,
+        next_multiple: np.ndarray,
+        odd_low: int,
+        seg_len: int,
+    ) -> None:
+        """Numba-compiled equivalent of _mark_composites_py.
+
+        The scalar store loop is lowered by LLVM into a tight native loop,
+        removing per-prime interpreter dispatch.
+        """
+        num_primes = base_primes.shape[0]
+        # next_multiple holds odd-only indices while the blocks are swept
+        for i in range(num_primes):
+            next_multiple[i] = (next_multiple[i] - odd_low) >> 1
+
+        for block_start in range(0, seg_len, SIEVE_BLOCK_SIZE):
+            block_end = min(block_start + SIEVE_BLOCK_SIZE, seg_len)
+            for i in range(num_primes):
+                p = base_primes[i]
+                j = next_multiple[i]
+                while j < block_end:
+                    sieve[j] = 0
+                    j += p
+                next_multiple[i] = j
+
+        for i in range(num_primes):
+            next_multiple[i] = odd_low + 2 * next_multiple[i]
+
+
+def _load_c_kernel(path: Optional[str] = None) -> Optional[ctypes.CDLL]:
+    """Load the native kernels built from _sieve_kernel.c, if present
+
+    Args:
+        path: Shared library to load (default: _sieve_kernel.so next to
+            this module, as built by `make kernel`)
+
+    Returns:
+        The loaded library, or None when _sieve_kernel.so has not been built
+    """
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_sieve_kernel.so")
+    try:
+        lib = ctypes.CDLL(path)
+        lib.mark_composites.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int64,
+            ctypes.c_int64, ctypes.c_int64, ctypes.c_int64,
+        ]
+        lib.mark_composites.restype = None
+        lib.collect_primes.argtypes = [
+            ctypes.c_void_p, ctypes.c_int64, ctypes.c_int64, ctypes.c_void_p,
+        ]
+        lib.collect_primes.restype = ctypes.c_int64
+    except (OSError, AttributeError):
+        # Missing library, or one built from an older _sieve_kernel.c
+        return None
+    return lib
+
+
+_C_KERNEL = _load_c_kernel()
+
+
+def _mark_composites_c(
+    sieve: np.ndarray,
+    base_primes: np.ndarray,
+    next_multiple: np.ndarray,
+    odd_low: int,
+    seg_len: int,
+) -> None:
+    """Native equivalent of _mark_composites_py (one FFI call per segment)
+
+    All arrays must be C-contiguous: sieve as uint8, base_primes and
+    next_multiple as int64.
+    """
+    _C_KERNEL.mark_composites(  # type: ignore[union-attr]
+        sieve.ctypes.data, base_primes.ctypes.data, next_multiple.ctypes.data,
+        len(base_primes), odd_low, seg_len, SIEVE_BLOCK_SIZE,
+    )
+
+
+def _collect_primes_py(sieve: np.ndarray, odd_low: int, seg_len: int) -> np.ndarray:
+    """Return the numbers still marked prime in an odd-only segment.
+
+    NumPy fallback for _collect_primes: nonzero index i maps to
+    odd_low + 2*i. Scanning the buffer directly avoids materializing a
+    seg_len-sized comparison mask.
+
+    Args:
+        sieve: uint8 buffer where index i represents odd_low + 2*i
+        odd_low: First odd number represented by the segment
+        seg_len: Number of odd numbers in the segment
+
+    Returns:
+        int64 array of the primes in the segment
+    """
+    primes = np.flatnonzero(sieve[:seg_len]).astype(np.int64, copy=False)
+    primes *= 2
+    primes += odd_low
+    return primes
+
+
+def _collect_primes_c(sieve: np.ndarray, odd_low: int, seg_len: int) -> np.ndarray:
+    """Native equivalent of _collect_primes_py (branchless compaction loop)
+
+    np.flatnonzero branches on every entry, which mispredicts constantly at
+    prime densities; the C loop writes every slot and advances by the entry.
+    """
+    out = np.empty(seg_len, dtype=np.int64)
+    count = _C_KERNEL.collect_primes(  # type: ignore[union-attr]
+        sieve.ctypes.data, seg_len, odd_low, out.ctypes.data,
+    )
+    # Copy out the used prefix: a view would pin the seg_len-sized scratch
+    # buffer for as long as the caller (e.g. a parallel task) keeps it
+    return out[:count].copy()
+
+
+if _HAS_NUMBA:
+    @njit(cache=True, boundscheck=False)
+    def _collect_primes_numba_kernel(
+        sieve: np.ndarray, odd_low: int, seg_len: int, out: np.ndarray
+    ) -> int:
+        """Numba-compiled equivalent of the C collect_primes loop."""
+        count = 0
+        for i in range(seg_len):
+            out[count] = odd_low + 2 * i
+            count += sieve[i]
+        return count
+
+    def _collect_primes_numba(sieve: np.ndarray, odd_low: int, seg_len: int) -> np.ndarray:
+        """Numba equivalent of _collect_primes_c (returns a compact copy)"""
+        out = np.empty(seg_len, dtype=np.int64)
+        count = _collect_primes_numba_kernel(sieve, odd_low, seg_len, out)
+        return out[:count].copy()
+
+
+# Prefer the native kernels, then numba, then the NumPy fallbacks
+if _C_KERNEL is not None:
+    _mark_composites = _mark_composites_c
+    _collect_primes = _collect_primes_c
+elif _HAS_NUMBA:
+    _mark_composites = _mark_composites_numba
+    _collect_primes = _collect_primes_numba
+else:
+    _mark_composites = _mark_composites_py
+    _collect_primes = _collect_primes_py
+
+
+def _presieve_fill(buf: np.ndarray, odd_low: int, seg_len: int) -> None:
+    """Initialize an odd-only segment with multiples of PRESIEVE_PRIMES marked.
+
+    Copies one period of the precomputed pattern, then doubles the filled
+    prefix until the segment is covered (each copy is a plain memcpy).
+
+    Args:
+        buf: uint8 buffer where index i represents odd_low + 2*i
+        odd_low: First odd number represented by the segment (>= 3)
+        seg_len: Number of odd numbers in the segment
+    """
+    offset = ((odd_low - 3) // 2) % PRESIEVE_PERIOD
+    filled = min(PRESIEVE_PERIOD, seg_len)
+    buf[:filled] = _PRESIEVE_PATTERN[offset:offset + filled]
+    while filled < seg_len:
+        chunk = min(filled, seg_len - filled)
+        buf[filled:filled + chunk] = buf[:chunk]
+        filled += chunk
 
 
 def _sieve_segment_odd_only(
     low: int,
     high: int,
-    base_primes: List[int],
-    is_prime: bytearray,
-) -> List[int]:
-    """Process a single segment using odd-only sieve.
+    base_primes: np.ndarray,
+    buf: np.ndarray,
+    next_multiple: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Process a single segment above the presieve primes using odd-only sieve.
 
     Shared helper used by both sequential and parallel segmented sieves.
+    Segments start at sieve_low > sqrt(n), so 2 and PRESIEVE_PRIMES never
+    fall inside and no per-segment fixups are needed; the rare segment that
+    does reach down to them goes through _sieve_first_segment_odd_only.
+
+    Args:
+        low: Segment low bound (inclusive), must be > PRESIEVE_PRIMES[-1]
+        high: Segment high bound (exclusive)
+        base_primes: Precomputed primes up to sqrt(n) as int64 array
+            (excludes 2 and PRESIEVE_PRIMES)
+        buf: Reusable uint8 buffer (at least (high - low) // 2 + 1 entries)
+        next_multiple: Per-prime next odd multiple carried over from the
+            previous segment (see _mark_composites); updated in place.
+            Computed from scratch when omitted.
+
+    Returns:
+        int64 array of primes found in [low, high)
+    """
+    # Odd-only sieve: index i represents number odd_low + 2*i
+    odd_low = low | 1
+    seg_len = max(0, (high - odd_low + 1) // 2)  # count of odd numbers in [odd_low, high)
+
+    # base_primes is sorted: primes with p*p >= high have nothing to mark
+    active = int(np.searchsorted(base_primes, math.isqrt(max(high - 1, 0)), side='right'))
+    if next_multiple is None:
+        next_multiple = _first_multiples(base_primes[:active], odd_low)
+
+    # Reset buffer (1 = candidate prime, 0 = composite) from the presieve
+    # pattern, then mark the remaining base primes
+    _presieve_fill(buf, odd_low, seg_len)
+    _mark_composites(buf, base_primes[:active], next_multiple[:active], odd_low, seg_len)
+
+    return _collect_primes(buf, odd_low, seg_len)
+
+
+def _sieve_first_segment_odd_only(
+    low: int,
+    high: int,
+    base_primes: np.ndarray,
+    buf: np.ndarray,
+    next_multiple: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Process a segment that starts at or below PRESIEVE_PRIMES[-1].
+
+    Only reached for tiny n (sieve_low <= 13). 2 and the presieve primes are
+    not represented by the presieve pattern, so they are emitted directly
+    and the rest of the segment goes through _sieve_segment_odd_only.
 
     Args:
         low: Segment low bound (inclusive)
-        high: Segment high bound (exclusive), must be > 2
-        base_primes: Precomputed odd primes up to sqrt(n) (excludes 2)
-        is_prime: Reusable bytearray buffer (at least (high - low) // 2 bytes)
+        high: Segment high bound (exclusive)
+        base_primes: Precomputed primes up to sqrt(n) as int64 array
+            (excludes 2 and PRESIEVE_PRIMES)
+        buf: Reusable uint8 buffer (at least (high - low) // 2 + 1 entries)
+        next_multiple: As for _sieve_segment_odd_only
 
     Returns:
-        List of primes found in [max(low, 2), high)
+        int64 array of primes found in [low, high)
     """
-    primes: List[int] = []
+    small = np.array(
+        [p for p in (2,) + PRESIEVE_PRIMES if low <= p < high], dtype=np.int64
+    )
+    rest = _sieve_segment_odd_only(
+        PRESIEVE_PRIMES[-1] + 1, high, base_primes, buf, next_multiple
+    )
+    return np.concatenate((small, rest))
 
-    # Handle the prime 2 if it falls in this segment
-    if low <= 2 < high:
-        primes.append(2)
 
-    # Odd-only sieve: index i represents number odd_low + 2*i
-    # odd_low is the first odd number >= max(low, 3)
-    odd_low = max(low, 3)
-    if odd_low % 2 == 0:
-        odd_low += 1
-    if odd_low >= high:
-        return primes
-
-    seg_len = (high - odd_low + 1) // 2  # count of odd numbers in [odd_low, high)
-    if seg_len <= 0:
-        return primes
-
-    # Reset buffer
-    is_prime[:seg_len] = b'\x01' * seg_len
-    segment_view = memoryview(is_prime)[:seg_len]
-
-    for p in base_primes:
-        # Find first odd multiple of p in [odd_low, high)
-        start = ((odd_low + p - 1) // p) * p
-        if start < p * p:
-            start = p * p
-        if start % 2 == 0:
-            start += p
-
-        if start >= high:
-            continue
-
-        # Map to index in odd-only array
-        adjusted_start = (start - odd_low) // 2
-        step = p  # step in index space = p (since each index step = 2 numbers)
-        count = (seg_len - adjusted_start + step - 1) // step
-        segment_view[adjusted_start::step] = b'\x00' * count
-
-    # Extract primes using bytes.find()
-    data = bytes(segment_view)
-    _append = primes.append
-    idx = -1
-    while True:
-        idx = data.find(1, idx + 1)
-        if idx == -1:
-            break
-        _append(odd_low + 2 * idx)
+# Per-worker state set by _init_worker: the parent's base primes, mapped
+# once per worker process rather than once per task
+_worker_base_primes_shm: Optional[shared_memory.SharedMemory] = None
+_worker_base_primes: Optional[np.ndarray] = None
 
-    return primes
+
+def _init_worker(base_primes_shm_name: str, num_base_primes: int) -> None:
+    """Pool initializer: attach to the shared base primes
+
+    The mapping lives until the worker exits, so tasks carry no base prime
+    data at all, only segment indices.
+
+    Args:
+        base_primes_shm_name: Name of the SharedMemory block holding the
+            base primes as int64 (excludes 2 and PRESIEVE_PRIMES)
+        num_base_primes: Number of base primes in the shared block
+    """
+    global _worker_base_primes_shm, _worker_base_primes
+    _worker_base_primes_shm = shared_memory.SharedMemory(name=base_primes_shm_name)
+    _worker_base_primes = np.ndarray(
+        (num_base_primes,), dtype=np.int64, buffer=_worker_base_primes_shm.buf
+    )
 
 
 def _worker_process_segment_chunk(
-    start_seg: int,
-    end_seg: int,
+    segment_indices: Sequence[int],
     n: int,
     segment_size: int,
-    base_primes: List[int],
-    progress_counter: Optional[SharedCounter]
-) -> List[int]:
-    """Worker function to process a chunk of segments in parallel
+    sieve_low: int,
+) -> List[np.ndarray]:
+    """Worker function to process a set of segments in parallel
+
+    Reads the base primes set up by _init_worker.
 
     Args:
-        start_seg: Starting segment index (inclusive)
-        end_seg: Ending segment index (exclusive)
+        segment_indices: Segment indices to process, in increasing order
         n: Upper bound for primes
         segment_size: Size of each segment
-        base_primes: Precomputed odd primes up to sqrt(n) (excludes 2)
-        progress_counter: Shared multiprocessing.Value counter
+        sieve_low: Smallest number to sieve (primes below it are already known)
 
     Returns:
-        List of primes found in this worker's chunk (already sorted)
+        One int64 array of primes per entry in segment_indices, in the same
+        order. Arrays pickle as raw buffers, far smaller than lists of ints.
     """
-    primes: List[int] = []
+    chunks: List[np.ndarray] = []
+    base_primes = _worker_base_primes
+    assert base_primes is not None, "_init_worker not run"
 
     # Reusable buffer for segments
-    is_prime = bytearray(segment_size)
+    buf = np.empty(segment_size, dtype=np.uint8)
+
+    for seg_idx in segment_indices:
+        seg_start = seg_idx * segment_size
+        low = max(seg_start, sieve_low)
+        high = min(seg_start + segment_size, n)
+        segment_fn = (
+            _sieve_first_segment_odd_only
+            if low <= PRESIEVE_PRIMES[-1]
+            else _sieve_segment_odd_only
+        )
+        chunks.append(segment_fn(low, high, base_primes, buf))
+
+    return chunks
 
-    for seg_idx in range(start_seg, end_seg):
-        low = seg_idx * segment_size
-        high = min(low + segment_size, n)
 
-        if high <= 2:
-            if progress_counter is not None:
-                with progress_counter.get_lock():
-                    progress_counter.value += 1
-            continue
+def _worker_process_segment_chunk_star(
+    args: Tuple[Sequence[int], int, int, int]
+) -> Tuple[Sequence[int], List[np.ndarray]]:
+    """Single-argument wrapper for imap_unordered
 
-        seg_primes = _sieve_segment_odd_only(low, high, base_primes, is_prime)
-        primes.extend(seg_primes)
+    Returns:
+        The task's segment indices alongside the per-segment primes, so the
+        parent can slot results that arrive out of order
+    """
+    return args[0], _worker_process_segment_chunk(*args)
 
-        if progress_counter is not None:
-            with progress_counter.get_lock():
-                progress_counter.value += 1
+
+def _sieve_wheel30(
+    n: int, progress_callback: Optional[Callable[[int], None]] = None
+) -> array:
+    """Mod-30 wheel sieve backing sieve_of_eratosthenes(wheel=True).
+
+    Byte k holds 8 bits for the numbers 30*k + r, r in WHEEL_RESIDUES, so
+    multiples of 2, 3 and 5 are never stored: 30 numbers per byte versus
+    16 for the odd-only bit sieve.
+
+    Args:
+        n: Upper bound (exclusive), must be > 5
+        progress_callback: Optional function to call with current iteration count
+
+    Returns:
+        array('q') of all primes less than n
+    """
+    sieve_bytes = n // 30 + 1
+    # Padded to whole 64-bit words so small primes can use word masks; the
+    # padding only yields numbers >= n, which extraction filters out
+    sieve = np.full((sieve_bytes + 7) // 8 * 8, 0xFF, dtype=np.uint8)
+    sieve[0] &= 0xFE  # 1 is not prime
+    words = sieve.view('<u8')
+
+    max_check = math.isqrt(n)
+    candidate = 0
+
+    for k in range(max_check // 30 + 1):
+        for bit, r in enumerate(WHEEL_RESIDUES):
+            p = 30 * k + r
+            if p < 7:
+                continue
+            if p > max_check:
+                break
+            if (sieve[k] >> bit) & 1:
+                # Multiples p*q worth marking have q >= p and q coprime to
+                # 30. For each wheel residue of q, successive q values are
+                # 30 apart, so p*q advances p bytes and keeps its bit.
+                starts = []
+                for q_res in WHEEL_RESIDUES:
+                    q = q_res + 30 * max(0, (p - q_res + 29) // 30)
+                    m = p * q
+                    starts.append((m // 30, 0xFF ^ (1 << _WHEEL_BIT[m % 30])))
+
+                if p < WORD_MASK_PRIME_LIMIT:
+                    # All 8 streams repeat every p bytes, hence every p words:
+                    # strided ANDs up to the first word where every stream
+                    # has started, then one p-word mask for the rest
+                    w1 = max(byte for byte, _ in starts) // 8 + 1
+                    keep = np.full(8 * p, 0xFF, dtype=np.uint8)
+                    for byte, mask in starts:
+                        sieve[byte:w1 * 8:p] &= mask
+                        keep[(byte - w1 * 8) % p::p] &= mask
+                    if w1 < len(words):
+                        _and_repeating_mask(words, w1, keep.view('<u8'))
+                else:
+                    # One strided AND per residue
+                    for byte, mask in starts:
+                        sieve[byte::p] &= mask
+
+            if progress_callback:
+                progress_callback(candidate)
+            candidate += 1
+
+    primes = array('q', [2, 3, 5])
+    for byte_start in range(0, sieve_bytes, EXTRACT_CHUNK_BYTES):
+        bits = np.unpackbits(sieve[byte_start:min(byte_start + EXTRACT_CHUNK_BYTES,
+                                                  sieve_bytes)],
+                             bitorder='little')
+        idxs = np.flatnonzero(bits).astype(np.int64, copy=False)
+        nums = 30 * ((idxs >> 3) + byte_start) + _WHEEL_RESIDUES_ARR[idxs & 7]
+        primes.frombytes(nums[nums < n].view(np.uint8))
 
     return primes
 
 
+def _clear_bits_word_mask(words: np.ndarray, start_bit: int, p: int) -> None:
+    """Clear bits start_bit, start_bit + p, ... of a bit-packed sieve.
+
+    For odd p the cleared positions repeat every p 64-bit words, so a single
+    p-word AND mask is applied across the sieve through a (rows, p) reshape:
+    one contiguous, vectorized pass instead of 8 strided ones.
+
+    Args:
+        words: Packed sieve viewed as little-endian uint64 ('<u8')
+        start_bit: First bit to clear
+        p: Stride in bits (odd)
+    """
+    num_words = len(words)
+    w0 = start_bit >> 6
+
+    # First word: only bits at or above start_bit (lower ones include p itself)
+    first = 0
+    for b in range(start_bit & 63, 64, p):
+        first |= 1 << b
+    words[w0] &= np.uint64(first ^ 0xFFFF_FFFF_FFFF_FFFF)
+
+    w1 = w0 + 1
+    if w1 >= num_words:
+        return
+
+    # Period mask for words w1 .. w1+p-1: bit j clear iff w1*64 + j is hit
+    bits = np.ones(64 * p, dtype=np.uint8)
+    bits[(start_bit - w1 * 64) % p::p] = 0
+    keep = np.packbits(bits, bitorder='little').view('<u8')
+
+    _and_repeating_mask(words, w1, keep)
+
+
+def _and_repeating_mask(words: np.ndarray, start: int, keep: np.ndarray) -> None:
+    """AND words[start:] with keep repeated end to end.
+
+    The whole-period part is a (rows, len(keep)) reshape so NumPy broadcasts
+    the mask in one contiguous pass; the remainder takes a prefix of keep.
+
+    Args:
+        words: Array to update in place
+        start: First element of words the mask applies to
+        keep: One period of the mask
+    """
+    period = len(keep)
+    rows = (len(words) - start) // period
+    body = words[start:start + rows * period].reshape(rows, period)
+    body &= keep
+    tail = words[start + rows * period:]
+    tail &= keep[:len(tail)]
+
+
 def sieve_of_eratosthenes(
-    n: int, progress_callback: Optional[Callable[[int], None]] = None
-) -> List[int]:
+    n: int,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    wheel: bool = False,
+) -> array:
     """Generate all prime numbers less than n using Sieve of Eratosthenes
 
-    Uses odd-only sieve for 2x memory and work reduction.
+    Uses a bit-packed odd-only sieve: 1 bit per odd number, 16x less
+    memory than a byte-per-integer sieve.
 
     Args:
         n: Upper bound (exclusive)
         progress_callback: Optional function to call with current iteration count
+        wheel: Use the mod-30 wheel layout (1 bit per number coprime to 30)
 
     Returns:
-        List of all primes less than n
+        array('q') of all primes less than n
 
     Raises:
         ValueError: If n is negative
@@ -166,42 +675,59 @@ def sieve_of_eratosthenes(
         raise ValueError(f"n must be non-negative, got {n}")
 
     if n <= 2:
-        return []
+        return array('q')
 
     if n <= 3:
-        return [2]
+        return array('q', [2])
+
+    if wheel and n > 5:
+        return _sieve_wheel30(n, progress_callback)
 
-    # Odd-only sieve: index i represents number 2*i + 3
-    # So index 0 = 3, index 1 = 5, index 2 = 7, ...
+    # Odd-only sieve: bit i represents number 2*i + 3
+    # So bit 0 = 3, bit 1 = 5, bit 2 = 7, ...
+    # Bits are packed 8 per byte (little bit order): 1 for candidate primes,
+    # 0 once marked composite. Packing cuts memory traffic 8x vs a byte sieve.
     sieve_size = (n - 3 + 1) // 2  # count of odd numbers in [3, n)
-    sieve = bytearray(b'\x01') * sieve_size
+    sieve_bytes = (sieve_size + 7) // 8
+    # Padded to whole 64-bit words so small primes can use word masks;
+    # the padding bits are never extracted
+    sieve = np.full((sieve_size + 63) // 64 * 8, 0xFF, dtype=np.uint8)
+    words = sieve.view('<u8')
 
     max_check = math.isqrt(n)
-    _n = sieve_size
 
     for current in range(3, max_check + 1, 2):
         idx = (current - 3) // 2
-        if sieve[idx]:
+        if (sieve[idx >> 3] >> (idx & 7)) & 1:
             # Mark multiples of current starting at current*current
-            # current*current is odd (odd*odd), so (current*current - 3) // 2 is the index
+            # current*current is odd (odd*odd), so (current*current - 3) // 2 is the bit
             start_idx = (current * current - 3) // 2
-            step = current  # step in index space = current (since each index += 2 numbers)
-            count = (_n - start_idx + step - 1) // step
-            sieve[start_idx:_n:step] = b'\x00' * count
+            if current < WORD_MASK_PRIME_LIMIT:
+                _clear_bits_word_mask(words, start_idx, current)
+            else:
+                # Multiples are current bits apart, so every 8th one lands on
+                # the same bit position, current bytes further on: one strided
+                # AND per bit residue covers all of them.
+                for r in range(8):
+                    bit = start_idx + r * current
+                    sieve[bit >> 3::current] &= 0xFF ^ (1 << (bit & 7))
 
         if progress_callback:
             progress_callback((current - 3) // 2)
 
-    # Extract primes
-    primes = [2]
-    _append = primes.append
-    data = bytes(sieve)
-    idx = -1
-    while True:
-        idx = data.find(1, idx + 1)
-        if idx == -1:
-            break
-        _append(2 * idx + 3)
+    # Extract primes in chunks so the unpacked view stays cache-sized:
+    # set bit i maps to 2*i + 3
+    primes = array('q', [2])
+    for byte_start in range(0, sieve_bytes, EXTRACT_CHUNK_BYTES):
+        bits = np.unpackbits(
+            sieve[byte_start:byte_start + EXTRACT_CHUNK_BYTES],
+            count=min(EXTRACT_CHUNK_BYTES * 8, sieve_size - byte_start * 8),
+            bitorder='little',
+        )
+        idxs = np.flatnonzero(bits).astype(np.int64, copy=False)
+        idxs *= 2
+        idxs += byte_start * 16 + 3
+        primes.frombytes(idxs.view(np.uint8))
 
     return primes
 
@@ -210,7 +736,7 @@ def segmented_sieve(
     n: int,
     segment_size: int = DEFAULT_SEGMENT_SIZE,
     progress_callback: Optional[Callable[[int], None]] = None
-) -> List[int]:
+) -> array:
     """Generate all prime numbers less than n using Segmented Sieve of Eratosthenes
 
     Uses odd-only sieve for 2x memory and work reduction.
@@ -218,11 +744,11 @@ def segmented_sieve(
 
     Args:
         n: Upper bound (exclusive)
-        segment_size: Size of each segment (default 1_000_000)
+        segment_size: Size of each segment (default 2 * L1_DCACHE_SIZE)
         progress_callback: Optional function called with segment index for progress
 
     Returns:
-        List of all primes less than n
+        array('q') of all primes less than n
 
     Raises:
         ValueError: If n is negative
@@ -231,30 +757,45 @@ def segmented_sieve(
         raise ValueError(f"n must be non-negative, got {n}")
 
     if n <= 2:
-        return []
+        return array('q')
 
     base_limit = math.isqrt(n)
-    all_base_primes = sieve_of_eratosthenes(base_limit + 1)
-    # Odd base primes only (exclude 2) for segment sieving
-    base_primes_odd = [p for p in all_base_primes if p > 2]
-
+    base_primes = sieve_of_eratosthenes(base_limit + 1)
+    all_base_primes = np.frombuffer(base_primes, dtype=np.int64)
+    # Base primes for segment sieving: 2 is skipped by the odd-only layout
+    # and PRESIEVE_PRIMES are stamped by _presieve_fill
+    base_primes_odd = all_base_primes[all_base_primes > PRESIEVE_PRIMES[-1]]
+
+    # Primes <= base_limit are already known: seed the output with them and
+    # sieve segments from base_limit + 1 only
+    primes = array('q', base_primes)
+    sieve_low = base_limit + 1
     segments = (n + segment_size - 1) // segment_size
-    primes: List[int] = []
+    first_seg = sieve_low // segment_size
+
+    if progress_callback:
+        for seg_idx in range(first_seg):
+            progress_callback(seg_idx + 1)
 
     # Reusable buffer for segments
-    is_prime = bytearray(segment_size)
+    buf = np.empty(segment_size, dtype=np.uint8)
 
-    for seg_idx in range(segments):
-        low = seg_idx * segment_size
-        high = min(low + segment_size, n)
+    # Segments run back to back, so each prime's next multiple is carried
+    # from one segment to the next instead of being re-derived by division
+    next_multiple = _first_multiples(base_primes_odd, sieve_low | 1)
 
-        if high <= 2:
-            if progress_callback:
-                progress_callback(seg_idx + 1)
-            continue
+    for seg_idx in range(first_seg, segments):
+        seg_start = seg_idx * segment_size
+        low = max(seg_start, sieve_low)
+        high = min(seg_start + segment_size, n)
 
-        seg_primes = _sieve_segment_odd_only(low, high, base_primes_odd, is_prime)
-        primes.extend(seg_primes)
+        segment_fn = (
+            _sieve_first_segment_odd_only
+            if low <= PRESIEVE_PRIMES[-1]
+            else _sieve_segment_odd_only
+        )
+        seg_primes = segment_fn(low, high, base_primes_odd, buf, next_multiple)
+        primes.frombytes(seg_primes.view(np.uint8))
 
         if progress_callback:
             progress_callback(seg_idx + 1)
@@ -267,21 +808,22 @@ def parallel_segmented_sieve(
     num_workers: Optional[int] = None,
     segment_size: int = DEFAULT_SEGMENT_SIZE,
     progress_callback: Optional[Callable[[int], None]] = None
-) -> List[int]:
+) -> array:
     """Generate all prime numbers less than n using parallel Segmented Sieve
 
-    Uses odd-only sieve and heapq.merge for O(n) result merging.
+    Uses odd-only sieve; segments are dealt to workers round-robin and the
+    per-segment results are reassembled in segment order.
     Memory: O(sqrt(n) + segment_size) instead of O(n)
     Parallelism: Processes segments in parallel across workers
 
     Args:
         n: Upper bound (exclusive)
-        num_workers: Number of worker processes (default cpu_count - 1)
-        segment_size: Size of each segment (default 1_000_000)
+        num_workers: Number of worker processes (default usable CPUs - 1)
+        segment_size: Size of each segment (default 2 * L1_DCACHE_SIZE)
         progress_callback: Optional function called with segment count delta for progress
 
     Returns:
-        List of all primes less than n
+        array('q') of all primes less than n
 
     Raises:
         ValueError: If n is negative
@@ -290,77 +832,215 @@ def parallel_segmented_sieve(
         raise ValueError(f"n must be non-negative, got {n}")
 
     if n <= 2:
-        return []
+        return array('q')
 
     base_limit = math.isqrt(n)
-    all_base_primes = sieve_of_eratosthenes(base_limit + 1)
-    # Odd base primes only (exclude 2) for segment sieving
-    base_primes_odd = [p for p in all_base_primes if p > 2]
-
+    base_primes = sieve_of_eratosthenes(base_limit + 1)
+    all_base_primes = np.frombuffer(base_primes, dtype=np.int64)
+    # Base primes for segment sieving: 2 is skipped by the odd-only layout
+    # and PRESIEVE_PRIMES are stamped by _presieve_fill
+    base_primes_odd = all_base_primes[all_base_primes > PRESIEVE_PRIMES[-1]]
+
+    # Primes <= base_limit are already known; segments start above them
+    sieve_low = base_limit + 1
     segments = (n + segment_size - 1) // segment_size
+    first_seg = sieve_low // segment_size
+
+    # The sequential fallback reports a segment index per call; translate
+    # that into the one-segment deltas this function's callers expect
+    fallback_callback: Optional[Callable[[int], None]] = None
+    if progress_callback:
+        report = progress_callback
+
+        def count_segment(seg_idx: int) -> None:
+            report(1)
+        fallback_callback = count_segment
 
     if num_workers is None:
-        num_workers = max(1, multiprocessing.cpu_count() - 1)
+        # Respect the CPU affinity mask (taskset, cgroups) where available
+        try:
+            available_cpus = len(os.sched_getaffinity(0))
+        except AttributeError:
+            available_cpus = multiprocessing.cpu_count()
+        num_workers = max(1, available_cpus - 1)
 
-    num_workers = min(num_workers, segments)
+    num_workers = min(num_workers, segments - first_seg)
 
-    progress_counter: Optional[SharedCounter] = None
-    monitor_thread: Optional[threading.Thread] = None
-    stop_monitoring = threading.Event()
+    # Share base primes with workers through one SharedMemory block; its
+    # name is handed to each worker once, through the pool initializer
+    try:
+        base_primes_shm = shared_memory.SharedMemory(
+            create=True, size=max(1, base_primes_odd.nbytes)
+        )
+    except OSError:
+        return segmented_sieve(n, segment_size, fallback_callback)
+    np.ndarray(base_primes_odd.shape, dtype=np.int64, buffer=base_primes_shm.buf)[:] = (
+        base_primes_odd
+    )
 
-    if progress_callback:
-        try:
-            # Manager().Value is required here because pool.starmap pickles
-            # arguments -- plain multiprocessing.Value cannot be pickled.
-            manager = multiprocessing.Manager()
-            progress_counter = manager.Value('i', 0)
+    # Deal segments round-robin into several tasks per worker so every task
+    # gets a similar mix of low (cheap) and high (more base primes to mark)
+    # segments, and finished tasks can be consumed while others still run
+    num_tasks = min(segments - first_seg, TASKS_PER_WORKER * num_workers)
+    task_args = [
+        (range(first_seg + task_idx, segments, num_tasks), n, segment_size, sieve_low)
+        for task_idx in range(num_tasks)
+    ]
 
-            def monitor_progress() -> None:
-                last_seen = 0
-                while not stop_monitoring.is_set():
-                    current = progress_counter.value  # type: ignore[union-attr]
-                    if current > last_seen and progress_callback:
-                        progress_callback(current - last_seen)
-                        last_seen = current
-                    time_module.sleep(0.1)
+    all_primes = array('q', base_primes)
+    if progress_callback and first_seg:
+        progress_callback(first_seg)
 
-            monitor_thread = threading.Thread(target=monitor_progress, daemon=True)
-            monitor_thread.start()
-        except (OSError, ImportError):
-            progress_counter = None
-            monitor_thread = None
+    try:
+        # Slot each segment's primes back by index as tasks complete, then
+        # concatenate in segment order: sorted output without comparisons
+        segment_primes: List[np.ndarray] = [np.empty(0, dtype=np.int64)] * segments
+        with multiprocessing.Pool(
+            processes=num_workers,
+            initializer=_init_worker,
+            initargs=(base_primes_shm.name, len(base_primes_odd)),
+        ) as pool:
+            for segment_indices, task_primes in pool.imap_unordered(
+                _worker_process_segment_chunk_star, task_args, chunksize=1
+            ):
+                for seg_idx, seg_primes in zip(segment_indices, task_primes):
+                    segment_primes[seg_idx] = seg_primes
+                # Progress is reported from the parent as results arrive
+                if progress_callback:
+                    progress_callback(len(segment_indices))
+
+        for seg_primes in segment_primes[first_seg:]:
+            all_primes.frombytes(seg_primes.view(np.uint8))
+    except (OSError, multiprocessing.ProcessError, AttributeError):
+        # Fallback to sequential on multiprocessing errors
+        return segmented_sieve(n, segment_size, fallback_callback)
+    finally:
+        base_primes_shm.close()
+        base_primes_shm.unlink()
 
-    chunk_size = (segments + num_workers - 1) // num_workers
-    worker_args = []
+    return all_primes
 
-    for worker_idx in range(num_workers):
-        start_seg = worker_idx * chunk_size
-        end_seg = min(start_seg + chunk_size, segments)
 
-        if start_seg >= segments:
-            break
+_GPU_MARK_SOURCE = r'''
+extern "C" __global__
+void mark_composites(unsigned char *sieve, const long long *base_primes,
+                     const long long *start_idx, long long seg_len)
+{
+    /* One block per base prime; its threads split the prime's multiples */
+    long long p = base_primes[blockIdx.x];
+    long long stride = (long long)blockDim.x * p;
+    for (long long j = start_idx[blockIdx.x] + threadIdx.x * p; j < seg_len; j += stride) {
+        sieve[j] = 0;
+    }
+}
+'''
 
-        worker_args.append((start_seg, end_seg, n, segment_size, base_primes_odd, progress_counter))  # type: ignore[arg-type]
 
-    all_primes: List[int] = []
+@functools.lru_cache(maxsize=None)
+def _get_cupy() -> Optional[ModuleType]:
+    """Return the cupy module if it imports and sees a CUDA device, else None
 
+    Cached: the import and device query run once per process.
+    """
     try:
-        with multiprocessing.Pool(processes=num_workers) as pool:
-            results = pool.starmap(_worker_process_segment_chunk, worker_args)
+        import cupy  # type: ignore[import-not-found]
+    except ImportError:
+        return None
+    try:
+        if cupy.cuda.runtime.getDeviceCount() < 1:
+            return None
+    except cupy.cuda.runtime.CUDARuntimeError:
+        # No driver or device present
+        return None
+    return cupy
 
-        # Each worker's results are already sorted (contiguous segments).
-        # Use heapq.merge for O(n) merge of pre-sorted lists.
-        all_primes = list(heapq.merge(*results))
-    except (OSError, multiprocessing.ProcessError, AttributeError):
-        # Fallback to sequential on multiprocessing errors
-        return segmented_sieve(n, segment_size, progress_callback)
-    finally:
-        # Signal monitor thread to stop and wait for it
-        if monitor_thread is not None and monitor_thread.is_alive():
-            stop_monitoring.set()
-            monitor_thread.join(timeout=1.0)
 
-    return all_primes
+def gpu_segmented_sieve(
+    n: int,
+    segment_size: int = GPU_SEGMENT_SIZE,
+    progress_callback: Optional[Callable[[int], None]] = None
+) -> array:
+    """Generate all prime numbers less than n on a CUDA GPU via CuPy
+
+    Same odd-only segmented layout as segmented_sieve, but each segment is
+    a device buffer marked by a RawKernel launch (one block per base prime)
+    and extracted with cupy.flatnonzero; only the primes are copied back.
+    Falls back to segmented_sieve when CuPy or a CUDA device is unavailable.
+
+    Args:
+        n: Upper bound (exclusive)
+        segment_size: Numbers per device segment (default GPU_SEGMENT_SIZE)
+        progress_callback: Optional function called with segment index for progress
+
+    Returns:
+        array('q') of all primes less than n
+
+    Raises:
+        ValueError: If n is negative
+    """
+    if n < 0:
+        raise ValueError(f"n must be non-negative, got {n}")
+
+    cp = _get_cupy()
+    if cp is None:
+        return segmented_sieve(n, progress_callback=progress_callback)
+
+    if n <= 2:
+        return array('q')
+
+    base_limit = math.isqrt(n)
+    base_primes = sieve_of_eratosthenes(base_limit + 1)
+    all_base_primes = np.frombuffer(base_primes, dtype=np.int64)
+    # No presieve pattern on the device: every odd base prime is marked
+    base_primes_odd = all_base_primes[1:]
+    base_primes_dev = cp.asarray(base_primes_odd)
+    mark = cp.RawKernel(_GPU_MARK_SOURCE, 'mark_composites')
+
+    # Primes <= base_limit are already known: seed the output with them.
+    # Segments only hold odd numbers, so 2 is added here when n == 3
+    # leaves it above base_limit.
+    primes = array('q', base_primes)
+    sieve_low = base_limit + 1
+    if sieve_low <= 2:
+        primes.append(2)
+    segments = (n + segment_size - 1) // segment_size
+    first_seg = sieve_low // segment_size
+
+    if progress_callback:
+        for seg_idx in range(first_seg):
+            progress_callback(seg_idx + 1)
+
+    buf = cp.empty(segment_size // 2 + 1, dtype=cp.uint8)
+
+    for seg_idx in range(first_seg, segments):
+        seg_start = seg_idx * segment_size
+        low = max(seg_start, sieve_low)
+        high = min(seg_start + segment_size, n)
+        odd_low = max(low, 3) | 1
+        seg_len = max(0, (high - odd_low + 1) // 2)
+
+        # Only primes with p*p < high can mark anything in this segment
+        active = int(np.searchsorted(
+            base_primes_odd, math.isqrt(max(high - 1, 0)), side='right'
+        ))
+        seg = buf[:seg_len]
+        seg.fill(1)
+        if active:
+            start_idx = (_first_multiples(base_primes_odd[:active], odd_low) - odd_low) >> 1
+            mark(
+                (active,), (GPU_THREADS_PER_BLOCK,),
+                (seg, base_primes_dev, cp.asarray(start_idx), np.int64(seg_len)),
+            )
+
+        seg_primes = cp.flatnonzero(seg).astype(cp.int64, copy=False)
+        seg_primes *= 2
+        seg_primes += odd_low
+        primes.frombytes(cp.asnumpy(seg_primes).view(np.uint8))
+
+        if progress_callback:
+            progress_callback(seg_idx + 1)
+
+    return primes
 
 
 def _get_tqdm():
@@ -433,7 +1113,7 @@ def generate_primes(
     show_progress: bool = False,
     parallel: bool = False,
     force_algorithm: Optional[str] = None
-) -> List[int]:
+) -> array:
     """Generate all prime numbers less than n.
 
     Auto-selects algorithm based on n for optimal performance.
@@ -442,10 +1122,13 @@ def generate_primes(
         n: Upper bound (exclusive)
         show_progress: Display progress indicator
         parallel: Use parallel processing CPU workers (for large n)
-        force_algorithm: Override auto-selection ('classic', 'segmented', or 'parallel')
+        force_algorithm: Override auto-selection ('classic', 'segmented',
+            'parallel', or 'gpu'). 'gpu' offloads to a CUDA device through
+            CuPy for n >= GPU_SIEVE_THRESHOLD and runs the CPU segmented
+            sieve otherwise or when CuPy is unavailable.
 
     Returns:
-        List of primes as integers
+        array('q') of primes (use list(primes) if a list is needed)
 
     Raises:
         ValueError: If n is negative
@@ -454,12 +1137,15 @@ def generate_primes(
         raise ValueError(f"n must be non-negative, got {n}")
 
     if n <= 2:
-        return []
+        return array('q')
 
-    use_segmented = force_algorithm in ("segmented", "parallel") or (
+    use_segmented = force_algorithm in ("segmented", "parallel", "gpu") or (
         force_algorithm is None and n >= SEGMENTED_SIEVE_THRESHOLD
     )
 
+    use_gpu = (force_algorithm == "gpu" and n >= GPU_SIEVE_THRESHOLD
+               and _get_cupy() is not None)
+
     use_parallel = (force_algorithm == "parallel" or
                     (parallel and n >= PARALLEL_SIEVE_THRESHOLD))
 
@@ -471,7 +1157,8 @@ def generate_primes(
     if show_progress:
         tqdm_cls, tqdm_available = _get_tqdm()
         if use_segmented:
-            segments = (n + DEFAULT_SEGMENT_SIZE - 1) // DEFAULT_SEGMENT_SIZE
+            segment_size = GPU_SEGMENT_SIZE if use_gpu else DEFAULT_SEGMENT_SIZE
+            segments = (n + segment_size - 1) // segment_size
             if tqdm_available and tqdm_cls is not None:
                 tqdm_ctx = tqdm_cls(total=segments, desc="Generating primes", unit="segments")
                 def progress_cb_tqdm(seg_idx: int) -> None:
@@ -482,6 +1169,14 @@ def generate_primes(
                 def progress_cb_simple(seg_idx: int) -> None:
                     progress_bar_obj.update(1)  # type: ignore[union-attr]
                 progress_cb = progress_cb_simple
+            if use_parallel and not use_gpu:
+                # The parallel sieve reports segment count deltas per task
+                # rather than one call per segment index
+                bar = tqdm_ctx if tqdm_ctx is not None else progress_bar_obj
+                bar_update = bar.update  # type: ignore[union-attr]
+                def progress_cb_parallel(delta: int) -> None:
+                    bar_update(delta)
+                progress_cb = progress_cb_parallel
         else:
             total = math.isqrt(n)
             if tqdm_available and tqdm_cls is not None:
@@ -496,9 +1191,11 @@ def generate_primes(
                 progress_cb = progress_cb_simple_classic
 
     # Select and run algorithm
-    primes: List[int]
+    primes: array
     if use_segmented:
-        if use_parallel:
+        if use_gpu:
+            primes = gpu_segmented_sieve(n, progress_callback=progress_cb)
+        elif use_parallel:
             primes = parallel_segmented_sieve(n, segment_size=DEFAULT_SEGMENT_SIZE,
                                               progress_callback=progress_cb)
         else:
@@ -515,6 +1212,26 @@ def generate_primes(
     return primes
 
 
+def write_primes(out: BinaryIO, n: int, primes: Sequence[int]) -> None:
+    """Write the "Primes less than n : ..." line to a binary stream.
+
+    Formats and writes OUTPUT_CHUNK_PRIMES primes at a time, so peak memory
+    stays bounded instead of joining the whole list into one string.
+
+    Args:
+        out: Binary file object (e.g. sys.stdout.buffer)
+        n: Upper bound the primes were generated for
+        primes: Primes to print, in increasing order
+    """
+    out.write(f"Primes less than {n} : ".encode())
+    for start in range(0, len(primes), OUTPUT_CHUNK_PRIMES):
+        chunk = ", ".join(map(str, primes[start:start + OUTPUT_CHUNK_PRIMES]))
+        if start:
+            out.write(b", ")
+        out.write(chunk.encode())
+    out.write(b"\n")
+
+
 def main() -> None:
     """Main function to handle user input and output
 
@@ -566,7 +1283,9 @@ def main() -> None:
 
         if primes:
             if not args.quiet:
-                print("Primes less than", n, ":", ", ".join(str(p) for p in primes))
+                sys.stdout.flush()
+                write_primes(sys.stdout.buffer, n, primes)
+                sys.stdout.buffer.flush()
                 print(f"Total primes: {len(primes)}")
             else:
                 print(len(primes))
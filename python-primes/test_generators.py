@@ -3,13 +3,37 @@
 Tests for prime_generator
 """
 
-import unittest
+import io
+import os
+import shutil
+import subprocess
+import tempfile
 import time
+import unittest
+from array import array
+from multiprocessing import shared_memory
+from unittest import mock
+
+import numpy as np
+
+import prime_generator
 from prime_generator import (
     generate_primes,
     sieve_of_eratosthenes,
     segmented_sieve,
     parallel_segmented_sieve,
+    gpu_segmented_sieve,
+    _collect_primes,
+    _collect_primes_py,
+    _first_multiples,
+    _get_cupy,
+    _init_worker,
+    _load_c_kernel,
+    _mark_composites,
+    _mark_composites_py,
+    _worker_process_segment_chunk,
+    write_primes,
+    OUTPUT_CHUNK_PRIMES,
 )
 
 
@@ -33,35 +57,35 @@ class TestGeneratePrimes(unittest.TestCase):
 
     def test_small_input(self):
         """Test with n = 10 - should return primes [2, 3, 5, 7]"""
-        self.assertEqual(generate_primes(10), [2, 3, 5, 7])
+        self.assertEqual(list(generate_primes(10)), [2, 3, 5, 7])
 
     def test_boundary_case_n_equals_2(self):
         """Test with n = 2 - no primes less than 2"""
-        self.assertEqual(generate_primes(2), [])
+        self.assertEqual(list(generate_primes(2)), [])
 
     def test_large_input(self):
         """Verify correctness with known prime sequences"""
         # Primes under 30
         expected = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
-        self.assertEqual(generate_primes(30), expected)
+        self.assertEqual(list(generate_primes(30)), expected)
 
     def test_single_digit(self):
         """Test with n = 5"""
-        self.assertEqual(generate_primes(5), [2, 3])
+        self.assertEqual(list(generate_primes(5)), [2, 3])
 
     def test_edge_cases(self):
         """Test edge cases: n=0, n=1, n=2"""
-        self.assertEqual(generate_primes(0), [])
-        self.assertEqual(generate_primes(1), [])
-        self.assertEqual(generate_primes(2), [])
+        self.assertEqual(list(generate_primes(0)), [])
+        self.assertEqual(list(generate_primes(1)), [])
+        self.assertEqual(list(generate_primes(2)), [])
 
     def test_n_equals_3(self):
         """Test with n = 3 - should return [2]"""
-        self.assertEqual(generate_primes(3), [2])
+        self.assertEqual(list(generate_primes(3)), [2])
 
     def test_n_equals_4(self):
         """Test with n = 4 - should return [2, 3]"""
-        self.assertEqual(generate_primes(4), [2, 3])
+        self.assertEqual(list(generate_primes(4)), [2, 3])
 
     def test_negative_input_raises_error(self):
         """Test that negative input raises ValueError"""
@@ -84,7 +108,15 @@ class TestGeneratePrimes(unittest.TestCase):
         """Verify consecutive primes match expected sequence"""
         result = generate_primes(20)
         expected = [2, 3, 5, 7, 11, 13, 17, 19]
-        self.assertEqual(result, expected)
+        self.assertEqual(list(result), expected)
+
+    def test_returns_packed_int64_array(self):
+        """Primes are returned as array('q') for every algorithm"""
+        for algorithm in ['classic', 'segmented', 'parallel']:
+            with self.subTest(algorithm=algorithm):
+                result = generate_primes(1000, force_algorithm=algorithm)
+                self.assertIsInstance(result, array)
+                self.assertEqual(result.typecode, 'q')
 
     def test_performance_large_input(self):
         """Test that optimized algorithm handles large inputs efficiently"""
@@ -126,7 +158,7 @@ class TestSieveOfEratosthenes(unittest.TestCase):
 
     def test_basic_functionality(self):
         """Test basic sieve functionality"""
-        self.assertEqual(sieve_of_eratosthenes(10), [2, 3, 5, 7])
+        self.assertEqual(list(sieve_of_eratosthenes(10)), [2, 3, 5, 7])
 
     def test_with_progress_callback(self):
         """Test sieve with progress callback"""
@@ -134,21 +166,21 @@ class TestSieveOfEratosthenes(unittest.TestCase):
         primes = sieve_of_eratosthenes(50, lambda p: results.append(p))
 
         # Should still return correct primes
-        self.assertEqual(primes, [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47])
+        self.assertEqual(list(primes), [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47])
 
     def test_empty_result(self):
         """Test sieve for n <= 2"""
-        self.assertEqual(sieve_of_eratosthenes(0), [])
-        self.assertEqual(sieve_of_eratosthenes(1), [])
-        self.assertEqual(sieve_of_eratosthenes(2), [])
+        self.assertEqual(list(sieve_of_eratosthenes(0)), [])
+        self.assertEqual(list(sieve_of_eratosthenes(1)), [])
+        self.assertEqual(list(sieve_of_eratosthenes(2)), [])
 
     def test_n_equals_3(self):
         """Test sieve for n = 3"""
-        self.assertEqual(sieve_of_eratosthenes(3), [2])
+        self.assertEqual(list(sieve_of_eratosthenes(3)), [2])
 
     def test_n_equals_4(self):
         """Test sieve for n = 4"""
-        self.assertEqual(sieve_of_eratosthenes(4), [2, 3])
+        self.assertEqual(list(sieve_of_eratosthenes(4)), [2, 3])
 
     def test_negative_input_raises_error(self):
         """Test that negative input raises ValueError"""
@@ -161,6 +193,21 @@ class TestSieveOfEratosthenes(unittest.TestCase):
         for p in primes:
             self.assertTrue(_is_prime(p), f"{p} is not prime but was returned")
 
+    def test_word_mask_boundaries(self):
+        """Word-mask clearing is exact around uint64 word and period edges"""
+        for n in [129, 130, 131, 257, 1000, 16387, 70001]:
+            with self.subTest(n=n):
+                expected = [k for k in range(n) if _is_prime(k)]
+                self.assertEqual(list(sieve_of_eratosthenes(n)), expected)
+
+    def test_wheel_matches_odd_only(self):
+        """Mod-30 wheel layout should match the odd-only sieve"""
+        for n in [0, 3, 6, 7, 8, 30, 31, 49, 50, 961, 10007, 100000]:
+            with self.subTest(n=n):
+                self.assertEqual(
+                    sieve_of_eratosthenes(n, wheel=True), sieve_of_eratosthenes(n)
+                )
+
 
 class TestSegmentedSieve(unittest.TestCase):
     """Test the segmented sieve implementation"""
@@ -168,7 +215,7 @@ class TestSegmentedSieve(unittest.TestCase):
     def test_basic_functionality(self):
         """Test segmented sieve with small input"""
         result = segmented_sieve(10)
-        self.assertEqual(result, [2, 3, 5, 7])
+        self.assertEqual(list(result), [2, 3, 5, 7])
 
     def test_matches_classic_for_small_n(self):
         """Segmented sieve should match classic for n < threshold"""
@@ -218,11 +265,18 @@ class TestSegmentedSieve(unittest.TestCase):
                 expected = sieve_of_eratosthenes(100)
                 self.assertEqual(result, expected)
 
+    def test_segments_spanning_presieve_period(self):
+        """Segments longer than, and offset from, the presieve period"""
+        expected = sieve_of_eratosthenes(200000)
+        for seg_size in [30029, 30030, 65536]:
+            with self.subTest(seg_size=seg_size):
+                self.assertEqual(segmented_sieve(200000, segment_size=seg_size), expected)
+
     def test_empty_result(self):
         """Test segmented sieve for n <= 2"""
-        self.assertEqual(segmented_sieve(0), [])
-        self.assertEqual(segmented_sieve(1), [])
-        self.assertEqual(segmented_sieve(2), [])
+        self.assertEqual(list(segmented_sieve(0)), [])
+        self.assertEqual(list(segmented_sieve(1)), [])
+        self.assertEqual(list(segmented_sieve(2)), [])
 
     def test_negative_input_raises_error(self):
         """Test that negative input raises ValueError"""
@@ -258,6 +312,109 @@ class TestSegmentedSieve(unittest.TestCase):
         self.assertLess(elapsed, 5.0)
 
 
+def _kernel_backends():
+    """(name, mark, collect) for the dispatched kernels and each native backend.
+
+    The dispatched pair is always checked; the C and numba versions are
+    added whenever they are available, so neither goes untested just
+    because the other one is preferred.
+    """
+    backends = [("active", _mark_composites, _collect_primes)]
+    if prime_generator._C_KERNEL is not None:
+        backends.append(
+            ("c", prime_generator._mark_composites_c, prime_generator._collect_primes_c)
+        )
+    if prime_generator._HAS_NUMBA:
+        backends.append(
+            ("numba", prime_generator._mark_composites_numba,
+             prime_generator._collect_primes_numba)
+        )
+    return backends
+
+
+class TestMarkComposites(unittest.TestCase):
+    """Test the composite-marking and prime-collection kernels"""
+
+    def assert_mark_matches_python(self, mark):
+        """mark should clear and advance exactly like _mark_composites_py
+
+        The last case spans several cache blocks.
+        """
+        base_primes = np.asarray([3, 5, 7, 11, 13, 17, 19, 23, 29, 31], dtype=np.int64)
+        for odd_low, seg_len in [(3, 500), (1001, 500), (999_999, 37), (3, 600_001)]:
+            with self.subTest(odd_low=odd_low):
+                expected = np.ones(seg_len, dtype=np.uint8)
+                result = np.ones(seg_len, dtype=np.uint8)
+                expected_next = _first_multiples(base_primes, odd_low)
+                result_next = _first_multiples(base_primes, odd_low)
+                _mark_composites_py(expected, base_primes, expected_next, odd_low, seg_len)
+                mark(result, base_primes, result_next, odd_low, seg_len)
+                self.assertTrue(np.array_equal(result, expected))
+                self.assertTrue(np.array_equal(result_next, expected_next))
+
+    def assert_collect_matches_python(self, collect):
+        """collect should return what _collect_primes_py (np.flatnonzero) does"""
+        rng = np.random.default_rng(0)
+        sieve = (rng.random(10_000) < 0.1).astype(np.uint8)
+        for odd_low, seg_len in [(10_001, 10_000), (10_001, 0), (99, 17)]:
+            with self.subTest(odd_low=odd_low, seg_len=seg_len):
+                self.assertTrue(np.array_equal(
+                    collect(sieve, odd_low, seg_len),
+                    _collect_primes_py(sieve, odd_low, seg_len),
+                ))
+
+    def assert_carried_multiples_match_fresh_start(self, mark):
+        """next_multiple left by one segment is the fresh start of the next"""
+        base_primes = np.asarray([17, 19, 23, 29, 31, 37], dtype=np.int64)
+        odd_low, seg_len = 1001, 500
+        next_multiple = _first_multiples(base_primes, odd_low)
+        mark(np.ones(seg_len, dtype=np.uint8), base_primes, next_multiple, odd_low, seg_len)
+        expected = _first_multiples(base_primes, odd_low + 2 * seg_len)
+        self.assertTrue(np.array_equal(next_multiple, expected))
+
+    def test_kernel_matches_python_fallback(self):
+        """Every available marking kernel should match the Python fallback"""
+        for name, mark, _ in _kernel_backends():
+            with self.subTest(backend=name):
+                self.assert_mark_matches_python(mark)
+
+    def test_collect_matches_python_fallback(self):
+        """Every available prime collector should match np.flatnonzero extraction"""
+        for name, _, collect in _kernel_backends():
+            with self.subTest(backend=name):
+                self.assert_collect_matches_python(collect)
+
+    def test_carried_multiples_match_fresh_start(self):
+        """Every available marking kernel should advance next_multiple correctly"""
+        for name, mark, _ in _kernel_backends():
+            with self.subTest(backend=name):
+                self.assert_carried_multiples_match_fresh_start(mark)
+
+    @unittest.skipUnless(shutil.which("cc"), "C compiler required")
+    def test_built_c_kernel_matches_python_fallback(self):
+        """_sieve_kernel.c built fresh and loaded via ctypes matches Python
+
+        Covers the ctypes path (argument marshalling included) even in a
+        checkout where `make kernel` has not been run.
+        """
+        source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_sieve_kernel.c")
+        with tempfile.TemporaryDirectory() as tmp:
+            lib_path = os.path.join(tmp, "_sieve_kernel.so")
+            subprocess.run(
+                ["cc", "-O3", "-funroll-loops", "-shared", "-fPIC", "-o", lib_path, source],
+                check=True,
+            )
+            lib = _load_c_kernel(lib_path)
+            self.assertIsNotNone(lib)
+
+            with mock.patch.object(prime_generator, "_C_KERNEL", lib):
+                self.assert_mark_matches_python(prime_generator._mark_composites_c)
+                self.assert_collect_matches_python(prime_generator._collect_primes_c)
+                self.assert_carried_multiples_match_fresh_start(
+                    prime_generator._mark_composites_c
+                )
+
+
 class TestParallelSieve(unittest.TestCase):
     """Test the parallel segmented sieve implementation"""
 
@@ -286,7 +443,7 @@ class TestParallelSieve(unittest.TestCase):
         for n in [0, 1, 2]:
             with self.subTest(n=n):
                 result = parallel_segmented_sieve(n)
-                self.assertEqual(result, [])
+                self.assertEqual(list(result), [])
 
     def test_negative_input_raises_error(self):
         """Test that negative input raises ValueError"""
@@ -301,6 +458,48 @@ class TestParallelSieve(unittest.TestCase):
 
         self.assertEqual(seq_result, par_result)
 
+    def test_progress_when_pool_fails(self):
+        """Sequential fallback still reports one-segment deltas"""
+        ticks = []
+        with mock.patch("prime_generator.multiprocessing.Pool", side_effect=OSError):
+            primes = parallel_segmented_sieve(
+                10000, num_workers=2, segment_size=1000, progress_callback=ticks.append
+            )
+
+        self.assertEqual(primes, segmented_sieve(10000))
+        self.assertEqual(ticks, [1] * 10)
+
+    def test_generate_primes_progress_when_pool_fails(self):
+        """The progress bar ends exactly at its total after a fallback"""
+        with mock.patch("prime_generator.multiprocessing.Pool", side_effect=OSError), \
+                mock.patch("prime_generator._get_tqdm", return_value=(None, False)), \
+                mock.patch("prime_generator.SimpleProgressBar.render"), \
+                mock.patch("prime_generator.SimpleProgressBar.finish", autospec=True) as finish:
+            generate_primes(300_000, show_progress=True, force_algorithm="parallel")
+
+        bar = finish.call_args[0][0]
+        self.assertEqual(bar.completed, bar.total)
+
+    def test_worker_results_own_their_data(self):
+        """Worker arrays must not pin larger scratch buffers while queued"""
+        n, segment_size = 1_000_000, 65536
+        base = np.frombuffer(sieve_of_eratosthenes(1001), dtype=np.int64)
+        base_odd = np.ascontiguousarray(base[base > 13])
+        shm = shared_memory.SharedMemory(create=True, size=base_odd.nbytes)
+        try:
+            np.ndarray(base_odd.shape, dtype=np.int64, buffer=shm.buf)[:] = base_odd
+            _init_worker(shm.name, len(base_odd))
+            chunks = _worker_process_segment_chunk(range(0, 16, 4), n, segment_size, 1001)
+            for chunk in chunks:
+                retained = chunk.base.nbytes if chunk.base is not None else chunk.nbytes
+                self.assertEqual(retained, chunk.nbytes)
+        finally:
+            prime_generator._worker_base_primes = None
+            prime_generator._worker_base_primes_shm.close()  # type: ignore[union-attr]
+            prime_generator._worker_base_primes_shm = None
+            shm.close()
+            shm.unlink()
+
     def test_progress_with_parallel(self):
         """Test that progress parameter doesn't break parallel execution"""
         call_count = [0]
@@ -308,13 +507,62 @@ class TestParallelSieve(unittest.TestCase):
             call_count[0] += count
 
         n = 10000
-        # Note: Progress callbacks in parallel mode have limitations due to
-        # multiprocessing constraints with fork+thread combination
-        primes = parallel_segmented_sieve(n, num_workers=2, progress_callback=callback)
+        # Progress is reported from the parent as each task completes
+        primes = parallel_segmented_sieve(
+            n, num_workers=2, segment_size=1000, progress_callback=callback
+        )
 
-        # Verify correctness is more important than callback count
         expected = segmented_sieve(n)
         self.assertEqual(primes, expected)
+        self.assertEqual(call_count[0], 10)  # one tick per segment
+
+
+class TestGpuSieve(unittest.TestCase):
+    """Test the CuPy sieve (falls back to the CPU sieve without a GPU)"""
+
+    def test_matches_segmented(self):
+        """GPU (or fallback) results should match the CPU segmented sieve"""
+        for n in [0, 3, 4, 100, 10007]:
+            with self.subTest(n=n):
+                self.assertEqual(gpu_segmented_sieve(n), segmented_sieve(n))
+
+    @unittest.skipUnless(_get_cupy() is not None, "CuPy with a CUDA device required")
+    def test_small_device_segments(self):
+        """Many device segments should reassemble in order"""
+        n = 200_000
+        self.assertEqual(gpu_segmented_sieve(n, segment_size=4096), segmented_sieve(n))
+
+    def test_negative_input_raises_error(self):
+        """Test that negative input raises ValueError"""
+        with self.assertRaises(ValueError):
+            gpu_segmented_sieve(-1)
+
+    def test_generate_primes_gpu_below_threshold(self):
+        """force_algorithm='gpu' below GPU_SIEVE_THRESHOLD runs on the CPU"""
+        self.assertEqual(
+            generate_primes(100000, force_algorithm="gpu"), segmented_sieve(100000)
+        )
+
+
+class TestWritePrimes(unittest.TestCase):
+    """Test cases for the streamed prime output"""
+
+    def test_matches_joined_output(self):
+        """Chunked output equals a single ", ".join across chunk boundaries"""
+        n = 200000
+        primes = generate_primes(n)
+        self.assertGreater(len(primes), 2 * OUTPUT_CHUNK_PRIMES)
+
+        out = io.BytesIO()
+        write_primes(out, n, primes)
+        expected = f"Primes less than {n} : " + ", ".join(str(p) for p in primes) + "\n"
+        self.assertEqual(out.getvalue().decode(), expected)
+
+    def test_small_output(self):
+        """Test a list shorter than one chunk"""
+        out = io.BytesIO()
+        write_primes(out, 10, generate_primes(10))
+        self.assertEqual(out.getvalue(), b"Primes less than 10 : 2, 3, 5, 7\n")
 
 
 if __name__ == '__main__':